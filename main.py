@@ -3,80 +3,228 @@ GM Bot для Ink Chain - Прямая работа через Web3 (БЕЗ Sele
 Быстрее, надежнее, проще!
 """
 
-import json
 import logging
+import os
+import functools
+import ijson
+import orjson
 from datetime import datetime
-from web3 import Web3
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
+from web3.exceptions import TransactionNotFound
+try:
+    from web3.providers.rpc.utils import ExceptionRetryConfiguration, REQUEST_RETRY_ALLOWLIST
+except ImportError:  # web3 v6 - у AsyncHTTPProvider нет встроенных повторов
+    ExceptionRetryConfiguration = None
 import time
 import random
+import asyncio
+import aiohttp
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
 from pathlib import Path
 from eth_account import Account
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'gm_bot_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def setup_logging():
+    """
+    Настройка логирования. Вызывается из main(), а не при импорте модуля,
+    чтобы процессы пула подписи не создавали свои лог-файлы
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(f'gm_bot_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
+            logging.StreamHandler()
+        ]
+    )
+
 # ===== КОНФИГУРАЦИЯ КОНТРАКТА =====
 # Ink Mainnet
 INK_CHAIN_ID = 57073
 INK_RPC_URL = "https://rpc-gel.inkonchain.com"
 
+# Минимальный баланс для газа
+MIN_BALANCE_ETH = 0.0001
+
+# Максимум кошельков в одном batch JSON-RPC запросе (по 2 вызова на кошелек)
+RPC_BATCH_SIZE = 50
+
+# Повторы RPC запросов при перегрузке узла: 3 повтора с паузой 0.3, 0.6, 1.2 с
+RPC_RETRIES = 3
+RPC_RETRY_BACKOFF = 0.3
+RPC_RETRY_STATUSES = (429, 502, 503, 504)
+
+# Интервал опроса квитанций (блок в Ink ~1 с, чаще опрашивать бессмысленно)
+RECEIPT_POLL_INTERVAL = 2.0
+
+# Сколько ждать подтверждения транзакции
+RECEIPT_TIMEOUT = 120
+
+# После стольких неудачных batch запросов квитанций подряд опрос идет только по одной
+RECEIPT_BATCH_MAX_FAILURES = 3
+
+# Замеры для подписи в пуле процессов: подпись ~7 мс на транзакцию, запуск
+# spawn процесса с импортом web3 ~1 с. Пул из N процессов окупается, когда
+# кошельков больше 1 с / (7 мс * (1 - 1/N)): ~290 на 2 ядрах, ~190 на 4,
+# ~165 на 8. На одном ядре пул не окупается никогда
+PRESIGN_SIGN_SECONDS = 0.007
+PRESIGN_POOL_START_SECONDS = 1.0
+
 # Адрес контракта DailyGM на Ink Chain (правильный из explorer)
 GM_CONTRACT_ADDRESS = "0x9F500d075118272B3564ac6Ef2c70a9067Fd2d3F"
 
-# ABI контракта DailyGM на Ink Chain
-# Минимальный ABI для взаимодействия с контрактом
-GM_CONTRACT_ABI = [
-    {
-        "inputs": [],
-        "name": "gm",
-        "outputs": [],
-        "stateMutability": "nonpayable",
-        "type": "function"
-    }
-]
+@functools.lru_cache(maxsize=4)
+def _parse_config(config_path, mtime_ns):
+    """Разбор файла конфигурации - кэшируется, пока файл не изменился"""
+    return orjson.loads(Path(config_path).read_bytes())
+
+def _stream_config(config_path, wallet_range):
+    """
+    Потоковый разбор конфигурации: из списка wallets строятся объекты только
+    для выбранных кошельков, остальные пропускаются без создания dict
+    """
+    config = {}
+    wallets = []
+    value_builder = None   # значение текущего ключа верхнего уровня (кроме wallets)
+    wallet_builder = None  # текущий выбранный кошелек
+    key = None
+    index = -1
+    
+    with open(config_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == '':
+                if event in ('map_key', 'end_map') and value_builder is not None:
+                    config[key] = value_builder.value
+                    value_builder = None
+                if event == 'map_key':
+                    key = value
+                    if key != 'wallets':
+                        value_builder = ijson.ObjectBuilder()
+                continue
+            
+            if value_builder is not None:
+                value_builder.event(event, value)
+            elif prefix == 'wallets.item' and event == 'start_map':
+                index += 1
+                if Config.wallet_selected(index, wallet_range):
+                    wallet_builder = ijson.ObjectBuilder()
+            
+            if wallet_builder is not None:
+                wallet_builder.event(event, value)
+                if prefix == 'wallets.item' and event == 'end_map':
+                    wallets.append(wallet_builder.value)
+                    wallet_builder = None
+    
+    config['wallets'] = wallets
+    return config
+
+@functools.lru_cache(maxsize=64)
+def _format_timestamp(second):
+    """Форматирование времени результата - один раз на каждую секунду"""
+    return datetime.fromtimestamp(second).isoformat(' ', 'seconds')
+
+def _sign_worker(jobs):
+    """
+    Подпись пачки транзакций в процессе пула (ECDSA нагружает CPU и держит GIL).
+    Ошибка подписи одной транзакции не отменяет остальные - вместо нее None
+    """
+    raw_transactions = []
+    for private_key, transaction in jobs:
+        try:
+            raw_transactions.append(
+                bytes(Account.from_key(private_key).sign_transaction(transaction).raw_transaction)
+            )
+        except Exception:
+            raw_transactions.append(None)
+    return raw_transactions
 
 class Config:
     """Класс для работы с конфигурацией"""
     
     @staticmethod
-    def load_config(config_path='config.json'):
-        """Загрузка конфигурации из JSON файла"""
+    def parse_wallet_range(wallet_range):
+        """
+        Приведение диапазона кошельков к (start, end) или списку индексов
+        
+        Строки "1-10" и "5" - номера кошельков с 1 включительно,
+        tuple (0, 5) и список [0, 2, 5] - индексы с 0
+        """
+        if wallet_range is None or isinstance(wallet_range, tuple):
+            return wallet_range
+        if isinstance(wallet_range, str):
+            if '-' in wallet_range:
+                first, last = wallet_range.split('-', 1)
+            else:
+                first = last = wallet_range
+            return (max(int(first) - 1, 0), int(last))
+        return list(wallet_range)
+    
+    @staticmethod
+    def wallet_selected(index, wallet_range):
+        """Входит ли кошелек с индексом index в разобранный диапазон"""
+        if wallet_range is None:
+            return True
+        if isinstance(wallet_range, tuple):
+            return wallet_range[0] <= index < wallet_range[1]
+        return index in wallet_range
+    
+    @staticmethod
+    def load_config(config_path='config.json', wallet_range=None):
+        """
+        Загрузка конфигурации из JSON файла
+        
+        Args:
+            config_path: Путь к файлу конфигурации
+            wallet_range: Диапазон кошельков (см. parse_wallet_range). Если задан,
+                          файл разбирается потоково и в память попадают только
+                          выбранные кошельки; [] - конфиг без кошельков
+        """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            mtime_ns = os.stat(config_path).st_mtime_ns
+            if wallet_range is not None:
+                return _stream_config(config_path, Config.parse_wallet_range(wallet_range))
+            
+            config = _parse_config(config_path, mtime_ns)
+            # Бот изменяет конфиг и кошельки - отдаем копию, чтобы не портить кэш
+            return {**config, 'wallets': [dict(w) for w in config.get('wallets', [])]}
         except FileNotFoundError:
             logger.error(f"Файл конфигурации {config_path} не найден!")
             Config.create_default_config(config_path)
             logger.info(f"Создан файл конфигурации по умолчанию: {config_path}")
             return None
     
+    @staticmethod
+    def find_latest_failed_file():
+        """Поиск самого нового failed файла по времени изменения (за один проход)"""
+        latest_file = None
+        best_mtime = -1
+        with os.scandir('.') as entries:
+            for entry in entries:
+                if entry.name.startswith('failed_wallets_') and entry.name.endswith('.json'):
+                    mtime = entry.stat().st_mtime
+                    if mtime > best_mtime:
+                        latest_file, best_mtime = entry.name, mtime
+        return latest_file
+    
     @staticmethod
     def load_failed_wallets(failed_file=None):
         """Загрузка failed кошельков для retry"""
         if failed_file is None:
             # Ищем последний failed файл
-            import glob
-            failed_files = glob.glob('failed_wallets_*.json')
-            if not failed_files:
+            failed_file = Config.find_latest_failed_file()
+            if failed_file is None:
                 logger.error("❌ Не найдено файлов с failed кошельками!")
                 return None
-            failed_file = max(failed_files)  # Берем самый новый
             logger.info(f"📂 Используем последний failed файл: {failed_file}")
         
         try:
-            with open(failed_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"✅ Загружено {data['count']} failed кошельков")
-                logger.info(f"📅 Дата: {data.get('timestamp', 'unknown')}")
-                return data['wallets']
+            data = orjson.loads(Path(failed_file).read_bytes())
+            logger.info(f"✅ Загружено {data['count']} failed кошельков")
+            logger.info(f"📅 Дата: {data.get('timestamp', 'unknown')}")
+            return data['wallets']
         except FileNotFoundError:
             logger.error(f"❌ Файл {failed_file} не найден!")
             return None
@@ -84,6 +232,52 @@ class Config:
             logger.error(f"❌ Ошибка загрузки failed кошельков: {e}")
             return None
     
+    @staticmethod
+    def normalize_wallets(wallets):
+        """
+        Нормализация кошельков один раз при загрузке: checksum адрес и ключ без 0x.
+        Кошельки с неверным адресом, ключом или ключом от другого адреса
+        помечаются полем '_error' и попадают в failed без обращения к RPC.
+        Разобранный ключ сохраняется в '_account' для подписи.
+        
+        Returns:
+            int: количество невалидных кошельков
+        """
+        invalid = 0
+        for wallet in wallets:
+            private_key = wallet.get('private_key') or ''
+            if private_key[:2].lower() == '0x':
+                private_key = private_key[2:]
+            wallet['private_key'] = private_key
+            
+            address = wallet.get('address')
+            try:
+                if not address:
+                    raise ValueError("адрес не указан")
+                wallet['address'] = Web3.to_checksum_address(address)
+            except (ValueError, TypeError) as e:
+                # Адрес остается строкой - он попадет в лог и в failed файл
+                wallet['address'] = str(address or '')
+                wallet['_error'] = f"Неверный адрес: {e}"
+            else:
+                try:
+                    if len(private_key) != 64:
+                        raise ValueError(f"длина {len(private_key)} вместо 64")
+                    bytes.fromhex(private_key)
+                    account = Account.from_key(private_key)
+                except ValueError as e:
+                    wallet['_error'] = f"Неверный приватный ключ: {e}"
+                else:
+                    if account.address != wallet['address']:
+                        wallet['_error'] = f"Приватный ключ от другого адреса: {account.address}"
+                    else:
+                        wallet['_account'] = account
+            
+            if '_error' in wallet:
+                invalid += 1
+                logger.error(f"❌ Кошелек {wallet['address'] or '(без адреса)'}: {wallet['_error']}")
+        return invalid
+    
     @staticmethod
     def create_default_config(config_path='config.json'):
         """Создание файла конфигурации по умолчанию"""
@@ -93,6 +287,8 @@ class Config:
             "gm_contract_address": "0x9F500d075118272B35564ac6Ef2c70a9067Fd2d3F",
             "max_retries": 3,
             "retry_delay": 5,
+            "max_workers": 8,
+            "receipt_poll_seconds": RECEIPT_POLL_INTERVAL,
             "gas_price_multiplier": 1.1,
             "max_gas_price_gwei": 50,
             "delay_between_wallets": {
@@ -113,8 +309,7 @@ class Config:
                 }
             ]
         }
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=4, ensure_ascii=False)
+        Path(config_path).write_bytes(orjson.dumps(default_config, option=orjson.OPT_INDENT_2))
 
 class WalletStatus:
     """Класс для отслеживания статуса кошельков"""
@@ -124,8 +319,17 @@ class WalletStatus:
     NETWORK_ERROR = "🌐 Ошибка сети"
     ALREADY_GMED = "⏰ Уже отправлен GM сегодня"
     TIMEOUT = "⏱️ Таймаут"
+    OUT_OF_GAS = "⛽ Не хватило газа"
     INVALID_CONTRACT = "🔧 Неверный адрес контракта"
 
+# Классификация ошибок по подстроке в тексте (lowercase), порядок = приоритет
+_ERROR_TABLE = (
+    ("insufficient funds", WalletStatus.INSUFFICIENT_BALANCE),
+    ("already", WalletStatus.ALREADY_GMED),
+    ("wait", WalletStatus.ALREADY_GMED),
+    ("timeout", WalletStatus.TIMEOUT),
+)
+
 class GMBot:
     """Основной класс бота"""
     
@@ -143,8 +347,18 @@ class GMBot:
                          - "1-10": кошельки 1-10 (строка)
         """
         self.config = config
-        self.results = []
         self.failed_wallets = []
+        self._status_counts = Counter()
+        self._result_fp = None
+        self._session = None
+        self._semaphore = None
+        self._wallet_state = {}
+        self._pending_receipts = {}
+        self._receipt_batch_failures = 0
+        self._presigned = {}
+        self._accounts = {}
+        self._gm_gas_limit = 100000
+        self._fee_params = None
         self.wallet_range = self._parse_wallet_range(wallet_range)
         
         # Фильтруем кошельки по диапазону
@@ -152,16 +366,36 @@ class GMBot:
             self.config['wallets'] = self._filter_wallets(config['wallets'])
             logger.info(f"🎯 Выбрано кошельков для обработки: {len(self.config['wallets'])}")
         
+        # Адрес в нижнем регистре для поиска - вычисляем один раз на кошелек
+        for wallet_data in self.config['wallets']:
+            wallet_data['_addr_lc'] = str(wallet_data.get('address') or '').lower()
+            # Ключ, уже разобранный при проверке в normalize_wallets
+            account = wallet_data.pop('_account', None)
+            if account is not None:
+                self._accounts[wallet_data['address']] = account
+        
         # Используем адрес контракта - всегда берем из константы, чтобы избежать проблем с checksum
         contract_addr = GM_CONTRACT_ADDRESS
         
-        # Подключение к Ink Chain
-        self.w3 = Web3(Web3.HTTPProvider(config.get('rpc_url', INK_RPC_URL)))
-        
-        if not self.w3.is_connected():
-            raise ConnectionError(f"Не удалось подключиться к RPC: {config.get('rpc_url')}")
-        
-        logger.info(f"✅ Подключено к Ink Chain (Chain ID: {self.w3.eth.chain_id})")
+        # Асинхронный провайдер - все RPC вызовы идут через один event loop.
+        # Подключение и проверка RPC выполняются в connect() внутри event loop
+        self._rpc_url = config.get('rpc_url', INK_RPC_URL)
+        provider_kwargs = {'request_kwargs': {'timeout': aiohttp.ClientTimeout(total=30)}}
+        if ExceptionRetryConfiguration is not None:
+            # Читающие методы из списка web3 плюс eth_feeHistory. Отправку транзакции
+            # не повторяем: при потерянном ответе повтор получит "already known",
+            # а повторы отправки уже делает цикл попыток _run_wallet
+            method_allowlist = [
+                method for method in REQUEST_RETRY_ALLOWLIST if method != 'eth_sendRawTransaction'
+            ]
+            provider_kwargs['exception_retry_configuration'] = ExceptionRetryConfiguration(
+                errors=(aiohttp.ClientError, asyncio.TimeoutError),
+                retries=RPC_RETRIES + 1,
+                backoff_factor=RPC_RETRY_BACKOFF,
+                method_allowlist=[*method_allowlist, 'eth_feeHistory']
+            )
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(self._rpc_url, **provider_kwargs))
+        self._chain_id = config.get('chain_id')
         
         # Инициализация контракта - используем Web3.to_checksum_address для получения правильного формата
         try:
@@ -169,29 +403,62 @@ class GMBot:
             normalized_addr = contract_addr.lower()
             checksum_addr = self.w3.to_checksum_address(normalized_addr)
             
-            self.gm_contract = self.w3.eth.contract(
-                address=checksum_addr,
-                abi=GM_CONTRACT_ABI
-            )
+            self._contract_address = checksum_addr
+            # gm() без аргументов - calldata это константный 4-байтовый селектор
+            self._gm_selector = Web3.to_hex(Web3.keccak(text='gm()')[:4])
             logger.info(f"✅ Контракт GM загружен: {checksum_addr}")
         except Exception as e:
             logger.error(f"❌ Ошибка загрузки контракта: {e}")
             raise
-        logger.info(f"✅ Контракт GM загружен: {contract_addr}")
         logger.info(f"📋 Загружено кошельков из конфига: {len(self.config['wallets'])}")
     
-    def check_balance(self, address):
+    async def connect(self):
+        """Открытие пула keep-alive соединений и проверка подключения к RPC"""
+        pool_size = max(32, self.config.get('max_workers', 8))
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        await self.w3.provider.cache_async_session(self._session)
+        
+        if not await self.w3.is_connected():
+            raise ConnectionError(f"Не удалось подключиться к RPC: {self._rpc_url}")
+        
+        # Chain ID из конфига; запрос к RPC только если он не указан
+        if not self._chain_id:
+            self._chain_id = await self.w3.eth.chain_id
+        logger.info(f"✅ Подключено к Ink Chain (Chain ID: {self._chain_id})")
+    
+    def _get_account(self, address, private_key):
+        """LocalAccount кошелька (ключ разбирается один раз на адрес)"""
+        account = self._accounts.get(address)
+        if account is None:
+            account = Account.from_key(private_key)
+            self._accounts[address] = account
+        return account
+    
+    async def check_balance(self, address):
         """Проверка баланса кошелька"""
         try:
-            address = Web3.to_checksum_address(address)
-            balance = self.w3.eth.get_balance(address)
+            balance = await self.w3.eth.get_balance(address)
             balance_eth = self.w3.from_wei(balance, 'ether')
-            logger.info(f"Баланс кошелька {address[:10]}...: {balance_eth:.6f} ETH")
+            logger.info("Баланс кошелька %s...: %.6f ETH", address[:10], balance_eth)
             return balance_eth
         except Exception as e:
-            logger.error(f"Ошибка проверки баланса для {address[:10]}...: {e}")
+            logger.error("Ошибка проверки баланса для %s...: %s", address[:10], e)
             return None
     
+    def _parse_wallet_range(self, wallet_range):
+        """Разбор диапазона кошельков (см. Config.parse_wallet_range)"""
+        return Config.parse_wallet_range(wallet_range)
+    
+    def _filter_wallets(self, wallets):
+        """Кошельки, входящие в self.wallet_range"""
+        return [
+            wallet_data for index, wallet_data in enumerate(wallets)
+            if Config.wallet_selected(index, self.wallet_range)
+        ]
+    
     def check_can_gm(self, address):
         """Проверка, можно ли отправить GM сегодня"""
         # Пока не знаем точной функции проверки в контракте
@@ -199,194 +466,654 @@ class GMBot:
         logger.info("✅ Пробуем отправить GM...")
         return True, 0
     
-    def estimate_gas(self, transaction):
+    async def get_gas_price(self):
+        """Цена газа с учетом лимита и множителя"""
+        gas_price = await self.w3.eth.gas_price
+        max_gas_price = self.w3.to_wei(
+            self.config.get('max_gas_price_gwei', 50), 
+            'gwei'
+        )
+        
+        if gas_price > max_gas_price:
+            logger.warning("⚠️ Цена газа высокая: %.2f Gwei", self.w3.from_wei(gas_price, 'gwei'))
+            gas_price = max_gas_price
+        
+        # Применяем множитель к цене газа для быстрого подтверждения
+        multiplier = self.config.get('gas_price_multiplier', 1.1)
+        return int(gas_price * multiplier)
+    
+    async def _rpc_batch(self, calls):
+        """Отправка нескольких JSON-RPC вызовов одним HTTP запросом"""
+        payload = [
+            {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        for retry in range(RPC_RETRIES + 1):
+            try:
+                async with self._session.post(self._rpc_url, json=payload) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+                break
+            except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # Повторяем только перегрузку узла и обрывы соединения
+                overloaded = not isinstance(e, aiohttp.ClientResponseError) or e.status in RPC_RETRY_STATUSES
+                if not overloaded or retry == RPC_RETRIES:
+                    raise
+                await asyncio.sleep(RPC_RETRY_BACKOFF * 2 ** retry)
+        if not isinstance(data, list):
+            raise ValueError(f"RPC не поддерживает batch запросы: {data}")
+        
+        # Ответы могут прийти в любом порядке - сопоставляем по id
+        by_id = {item.get('id'): item for item in data}
+        return [by_id.get(i, {}).get('result') for i in range(len(calls))]
+    
+    async def prefetch_wallet_state(self, addresses):
+        """
+        Предзагрузка баланса и nonce кошельков batch-запросами
+        
+        Returns:
+            dict: адрес (lowercase) -> (balance_eth, nonce).
+                  Кошельки, для которых batch не удался, отсутствуют -
+                  для них submit_gm_transaction делает отдельные запросы.
+        """
+        chunks = []
+        for start in range(0, len(addresses), RPC_BATCH_SIZE):
+            chunk = addresses[start:start + RPC_BATCH_SIZE]
+            calls = []
+            for address in chunk:
+                calls.append(('eth_getBalance', [address, 'latest']))
+                calls.append(('eth_getTransactionCount', [address, 'latest']))
+            chunks.append((chunk, calls))
+        
+        # Все batch-запросы отправляются параллельно
+        batch_results = await asyncio.gather(
+            *(self._rpc_batch(calls) for _, calls in chunks),
+            return_exceptions=True
+        )
+        
+        state = {}
+        for (chunk, _), results in zip(chunks, batch_results):
+            if isinstance(results, Exception):
+                logger.warning(f"⚠️ Batch запрос не удался: {results}. Используем отдельные запросы")
+                continue
+            
+            for i, address in enumerate(chunk):
+                balance, nonce = results[2 * i], results[2 * i + 1]
+                if balance is None or nonce is None:
+                    continue
+                state[address.lower()] = (
+                    self.w3.from_wei(int(balance, 16), 'ether'),
+                    int(nonce, 16)
+                )
+        
+        logger.info(f"📦 Предзагружено состояние кошельков: {len(state)}/{len(addresses)}")
+        return state
+    
+    async def get_fee_params(self):
+        """
+        Параметры комиссии EIP-1559 (type 2) по одному запросу fee_history
+        
+        Returns:
+            dict: поля комиссии для транзакции. Если RPC не поддерживает
+                  fee_history - legacy {'gasPrice': ...}
+        """
+        try:
+            history = await self.w3.eth.fee_history(1, 'latest', [50])
+            base_fee = history['baseFeePerGas'][-1]
+            tip = history['reward'][0][0]
+        except Exception as e:
+            logger.warning(f"⚠️ fee_history недоступен: {e}. Используем legacy gasPrice")
+            gas_price = await self.get_gas_price()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("💰 Цена газа: %.2f Gwei", self.w3.from_wei(gas_price, 'gwei'))
+            return {'gasPrice': gas_price}
+        
+        # Применяем множитель к чаевым для быстрого подтверждения
+        multiplier = self.config.get('gas_price_multiplier', 1.1)
+        tip = int(tip * multiplier)
+        max_fee = base_fee * 2 + tip
+        
+        max_gas_price = self.w3.to_wei(self.config.get('max_gas_price_gwei', 50), 'gwei')
+        if max_fee > max_gas_price:
+            logger.warning("⚠️ Цена газа высокая: %.2f Gwei", self.w3.from_wei(max_fee, 'gwei'))
+            max_fee = max_gas_price
+            tip = min(tip, max_fee)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "💰 Max fee: %.4f Gwei, tip: %.4f Gwei",
+                self.w3.from_wei(max_fee, 'gwei'), self.w3.from_wei(tip, 'gwei')
+            )
+        return {
+            'type': 2,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': tip
+        }
+    
+    async def estimate_gas(self, transaction):
         """Оценка газа для транзакции"""
         try:
-            gas_estimate = self.w3.eth.estimate_gas(transaction)
+            gas_estimate = await self.w3.eth.estimate_gas(transaction)
             # Добавляем 20% запаса
             return int(gas_estimate * 1.2)
         except Exception as e:
             logger.warning(f"Не удалось оценить газ: {e}. Используем значение по умолчанию")
             return 100000  # Стандартное значение
     
-    def send_gm_transaction(self, wallet_data):
-        """Отправка GM транзакции"""
-        address = Web3.to_checksum_address(wallet_data['address'])
-        private_key = wallet_data['private_key']
+    async def init_gas_limit(self):
+        """
+        Однократная оценка газа для gm() - стоимость вызова одинакова для всех
+        кошельков, поэтому результат используется для всех транзакций
+        """
+        wallets = [wallet_data for wallet_data in self.config['wallets'] if '_error' not in wallet_data]
+        if not wallets:
+            return
+        # Оцениваем от имени первого кошелька с достаточным балансом
+        sender = wallets[0]['address']
+        for wallet_data in wallets:
+            state = self._wallet_state.get(wallet_data['_addr_lc'])
+            if state is not None and state[0] >= MIN_BALANCE_ETH:
+                sender = wallet_data['address']
+                break
+        
+        self._gm_gas_limit = await self.estimate_gas({
+            'from': sender,
+            'to': self._contract_address,
+            'data': self._gm_selector
+        })
+        logger.info(f"⛽ Gas Limit: {self._gm_gas_limit}")
+    
+    async def reestimate_gas_limit(self, wallet_data):
+        """
+        Отдельная оценка газа для кошелька, которому не хватило общей оценки
+        (например, первый gm() кошелька дороже из-за записи в новый слот)
+        """
+        address = wallet_data['address']
+        used_limit = wallet_data.get('_gas_limit', self._gm_gas_limit)
+        gas_limit = await self.estimate_gas({
+            'from': address,
+            'to': self._contract_address,
+            'data': self._gm_selector
+        })
+        # Повтор с прежним лимитом упадет снова - берем не меньше +20% к нему
+        wallet_data['_gas_limit'] = max(gas_limit, int(used_limit * 1.2))
+        logger.info("⛽ Gas Limit для %s...: %s", address[:10], wallet_data['_gas_limit'])
+    
+    def _error_status(self, error_msg):
+        """Определение статуса по тексту ошибки"""
+        error_lc = error_msg.lower()
+        for needle, status in _ERROR_TABLE:
+            if needle in error_lc:
+                return status
+        return WalletStatus.FAILED
+    
+    @staticmethod
+    def _replacement_fees(fee_params, previous):
+        """
+        Комиссия для повтора: узел принимает транзакцию с тем же nonce взамен
+        зависшей, только если каждое поле комиссии выше прежнего минимум на 10%
+        """
+        if not previous or set(previous) != set(fee_params):
+            return fee_params
+        bumped = dict(fee_params)
+        for field in ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice'):
+            if field in bumped:
+                bumped[field] = max(bumped[field], previous[field] * 11 // 10 + 1)
+        return bumped
+    
+    def _build_transaction(self, address, nonce, fee_params, gas_limit=None):
+        """Транзакция вызова gm() - без параметров, calldata заранее закодирован"""
+        transaction = {
+            'to': self._contract_address,
+            'data': self._gm_selector,
+            'from': address,
+            'gas': gas_limit or self._gm_gas_limit,
+            'nonce': nonce,
+            'chainId': self._chain_id
+        }
+        transaction.update(fee_params)
+        return transaction
+    
+    async def presign_transactions(self):
+        """
+        Подпись транзакций первой попытки заранее в пуле процессов
+        (только для кошельков с предзагруженным состоянием и достаточным балансом)
+        
+        Returns:
+            dict: адрес (lowercase) -> raw_transaction. Пустой, если кошельков
+                  слишком мало для пула - тогда подпись идет при отправке
+        """
+        if self._fee_params is None:
+            return {}
+        
+        pending = []
+        for wallet_data in self.config['wallets']:
+            state = self._wallet_state.get(wallet_data['_addr_lc'])
+            if '_error' in wallet_data or state is None or state[0] < MIN_BALANCE_ETH:
+                continue
+            transaction = self._build_transaction(wallet_data['address'], state[1], self._fee_params)
+            pending.append((wallet_data['_addr_lc'], wallet_data['private_key'], transaction))
         
-        # Убираем 0x из приватного ключа если есть
-        if private_key.startswith('0x') or private_key.startswith('0X'):
-            private_key = private_key[2:]
+        workers = os.cpu_count() or 1
+        saved_seconds = len(pending) * PRESIGN_SIGN_SECONDS * (1 - 1 / workers)
+        if saved_seconds <= PRESIGN_POOL_START_SECONDS:
+            return {}
+        
+        # По одной пачке на процесс - меньше обмена данными между процессами
+        jobs = [(private_key, transaction) for _, private_key, transaction in pending]
+        chunk_size = -(-len(jobs) // workers)
+        loop = asyncio.get_running_loop()
+        # spawn вместо fork - к этому моменту у процесса уже есть потоки (DNS в aiohttp)
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(executor, _sign_worker, jobs[start:start + chunk_size])
+                for start in range(0, len(jobs), chunk_size)
+            ))
+        finally:
+            # Не блокируем event loop ожиданием завершения процессов
+            executor.shutdown(wait=False)
+        raw_transactions = [raw for chunk in chunks for raw in chunk]
+        
+        # Неподписанные заранее кошельки подпишутся при отправке и покажут ошибку там
+        presigned = {
+            addr_lc: raw for (addr_lc, _, _), raw in zip(pending, raw_transactions) if raw is not None
+        }
+        logger.info(f"✍️ Заранее подписано транзакций: {len(presigned)}/{len(pending)}")
+        return presigned
+    
+    async def submit_gm_transaction(self, wallet_data, state=None, raw_transaction=None, replace=False):
+        """
+        Отправка GM транзакции без ожидания подтверждения
+        
+        Args:
+            wallet_data: Данные кошелька
+            state: Предзагруженное состояние (balance_eth, nonce)
+                   из prefetch_wallet_state или None для отдельных запросов
+            raw_transaction: Заранее подписанная транзакция из presign_transactions
+            replace: Повторная попытка - транзакция подписывается со свежей
+                     комиссией, поднятой относительно прошлой попытки
+        
+        Returns:
+            tuple: (tx_hash, status, message). tx_hash равен None, если
+                   транзакция не отправлена - тогда status содержит причину
+        """
+        address = wallet_data['address']
+        tx_hash = None
         
         try:
             # Проверка баланса
-            balance_eth = self.check_balance(address)
-            min_balance = 0.0001  # Минимальный баланс для газа
+            if state is None:
+                balance_eth = await self.check_balance(address)
+            else:
+                balance_eth, nonce = state
+                logger.info("Баланс кошелька %s...: %.6f ETH", address[:10], balance_eth)
+            min_balance = MIN_BALANCE_ETH
             
             if balance_eth is None or balance_eth < min_balance:
-                return False, WalletStatus.INSUFFICIENT_BALANCE, f"Баланс: {balance_eth:.6f} ETH (нужно минимум {min_balance:.6f} ETH)"
+                return None, WalletStatus.INSUFFICIENT_BALANCE, f"Баланс: {balance_eth:.6f} ETH (нужно минимум {min_balance:.6f} ETH)"
             
             # Проверка, можно ли отправить GM
             can_gm, wait_seconds = self.check_can_gm(address)
             if not can_gm:
                 hours = wait_seconds // 3600
                 minutes = (wait_seconds % 3600) // 60
-                return False, WalletStatus.ALREADY_GMED, f"Следующий GM через {hours}ч {minutes}м"
-            
-            # Получение nonce
-            nonce = self.w3.eth.get_transaction_count(address)
+                return None, WalletStatus.ALREADY_GMED, f"Следующий GM через {hours}ч {minutes}м"
             
-            # Получение цены газа
-            gas_price = self.w3.eth.gas_price
-            max_gas_price = self.w3.to_wei(
-                self.config.get('max_gas_price_gwei', 50), 
-                'gwei'
-            )
-            
-            if gas_price > max_gas_price:
-                logger.warning(f"⚠️ Цена газа высокая: {self.w3.from_wei(gas_price, 'gwei'):.2f} Gwei")
-                gas_price = max_gas_price
-            
-            # Применяем множитель к цене газа для быстрого подтверждения
-            multiplier = self.config.get('gas_price_multiplier', 1.1)
-            gas_price = int(gas_price * multiplier)
-            
-            logger.info(f"💰 Цена газа: {self.w3.from_wei(gas_price, 'gwei'):.2f} Gwei")
-            
-            # Построение транзакции - вызываем метод gm() без параметров
-            transaction = self.gm_contract.functions.gm().build_transaction({
-                'from': address,
-                'gas': 100000,  # Временное значение для оценки
-                'gasPrice': gas_price,
-                'nonce': nonce,
-                'chainId': self.config.get('chain_id', INK_CHAIN_ID)
-            })
-            
-            # Оценка газа
-            gas_limit = self.estimate_gas(transaction)
-            transaction['gas'] = gas_limit
-            
-            logger.info(f"⛽ Gas Limit: {gas_limit}")
+            if raw_transaction is None:
+                if state is None:
+                    # Получение nonce
+                    nonce = await self.w3.eth.get_transaction_count(address)
+                
+                if replace:
+                    # Повтор с тем же nonce заменяет зависшую транзакцию прошлой попытки -
+                    # с той же комиссией он совпал бы с ней байт в байт
+                    fee_params = self._replacement_fees(
+                        await self.get_fee_params(), wallet_data.get('_fee_params')
+                    )
+                else:
+                    fee_params = self._fee_params or await self.get_fee_params()
+                transaction = self._build_transaction(
+                    address, nonce, fee_params, wallet_data.get('_gas_limit')
+                )
+                
+                # Подписание транзакции
+                account = self._get_account(address, wallet_data['private_key'])
+                raw_transaction = account.sign_transaction(transaction).raw_transaction
+                wallet_data['_fee_params'] = fee_params
+            else:
+                wallet_data['_fee_params'] = self._fee_params
             
-            # Подписание транзакции
-            account = Account.from_key(private_key)
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key)
+            # Хэш считаем сами - он нужен и тогда, когда узел уже знает транзакцию
+            tx_hash = Web3.keccak(raw_transaction)
+            tx_hash_hex = Web3.to_hex(tx_hash)
             
             # Отправка транзакции
             logger.info("📤 Отправка GM транзакции...")
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-            tx_hash_hex = tx_hash.hex()
+            await self.w3.eth.send_raw_transaction(raw_transaction)
             
-            logger.info(f"✅ Транзакция отправлена: {tx_hash_hex}")
-            logger.info(f"🔗 Эксплорер: https://explorer.inkonchain.com/tx/{tx_hash_hex}")
+            logger.info("✅ Транзакция отправлена: %s", tx_hash_hex)
+            logger.info("🔗 Эксплорер: https://explorer.inkonchain.com/tx/%s", tx_hash_hex)
+            return tx_hash, None, f"TX: {tx_hash_hex}"
+                
+        except Exception as e:
+            error_msg = str(e)
+            if tx_hash is not None and 'already known' in error_msg.lower():
+                # Та же транзакция уже в mempool (например, ответ на прошлую отправку
+                # потерялся) - это не "GM уже отправлен", ждем ее подтверждения
+                logger.info("ℹ️ Транзакция %s уже известна узлу, ждем подтверждения", tx_hash_hex)
+                return tx_hash, None, f"TX: {tx_hash_hex}"
+            logger.error("❌ Ошибка при отправке GM: %s", error_msg)
+            return None, self._error_status(error_msg), error_msg
+    
+    async def _poll_receipts(self):
+        """
+        Фоновый опрос квитанций: за каждый интервал один batch
+        eth_getTransactionReceipt на все ожидающие транзакции вместо
+        отдельного опроса каждой
+        """
+        interval = self.config.get('receipt_poll_seconds', RECEIPT_POLL_INTERVAL)
+        while True:
+            await asyncio.sleep(interval)
+            pending = list(self._pending_receipts)
             
-            # Ожидание подтверждения
-            logger.info("⏳ Ожидание подтверждения транзакции...")
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            for start in range(0, len(pending), RPC_BATCH_SIZE):
+                chunk = pending[start:start + RPC_BATCH_SIZE]
+                receipts = await self._fetch_receipts(chunk)
+                
+                for tx_hash_hex, receipt in zip(chunk, receipts):
+                    if receipt is None:
+                        continue
+                    future = self._pending_receipts.pop(tx_hash_hex, None)
+                    if future is not None and not future.done():
+                        future.set_result(receipt)
+    
+    async def _fetch_receipts(self, chunk):
+        """
+        Квитанции для списка хэшей: одним batch запросом, а если batch не
+        прошел - по одной через web3. Без квитанции (еще не в блоке или
+        ошибка запроса) - None, хэш опросится на следующем интервале
+        """
+        if self._receipt_batch_failures < RECEIPT_BATCH_MAX_FAILURES:
+            try:
+                receipts = await self._rpc_batch(
+                    [('eth_getTransactionReceipt', [tx_hash_hex]) for tx_hash_hex in chunk]
+                )
+            except Exception as e:
+                # Одна ошибка (лимит запросов, битый ответ) batch не отключает -
+                # только несколько подряд, как у RPC без поддержки batch
+                self._receipt_batch_failures += 1
+                logger.warning("⚠️ Batch запрос квитанций не удался: %s. Запрашиваем по одной", e)
+                if self._receipt_batch_failures == RECEIPT_BATCH_MAX_FAILURES:
+                    logger.warning("⚠️ Batch запросы квитанций отключены до конца запуска")
+            else:
+                self._receipt_batch_failures = 0
+                return receipts
+        
+        receipts = []
+        for result in await asyncio.gather(
+            *(self.w3.eth.get_transaction_receipt(tx_hash_hex) for tx_hash_hex in chunk),
+            return_exceptions=True
+        ):
+            if isinstance(result, TransactionNotFound):
+                result = None
+            elif isinstance(result, Exception):
+                logger.warning("⚠️ Не удалось получить квитанцию: %s", result)
+                result = None
+            receipts.append(result)
+        return receipts
+    
+    @staticmethod
+    def _quantity(value):
+        """Число из квитанции: hex строка из batch ответа или int от web3"""
+        return value if isinstance(value, int) else int(value, 16)
+    
+    async def wait_for_confirmation(self, tx_hash, gas_limit=None):
+        """
+        Ожидание подтверждения отправленной GM транзакции (квитанцию получает _poll_receipts)
+        
+        Args:
+            tx_hash: Хэш транзакции
+            gas_limit: Лимит газа транзакции - по нему reverted с израсходованным
+                       лимитом отличается от обычного reverted
+        """
+        tx_hash_hex = Web3.to_hex(tx_hash)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_receipts[tx_hash_hex] = future
+        
+        try:
+            logger.info("⏳ Ожидание подтверждения транзакции %s...", tx_hash_hex)
+            receipt = await asyncio.wait_for(future, timeout=RECEIPT_TIMEOUT)
             
-            if receipt['status'] == 1:
-                logger.info(f"🎉 GM успешно отправлен! Gas использовано: {receipt['gasUsed']}")
+            if self._quantity(receipt['status']) == 1:
+                logger.info("🎉 GM успешно отправлен! Gas использовано: %s", self._quantity(receipt['gasUsed']))
                 return True, WalletStatus.SUCCESS, f"TX: {tx_hash_hex}"
+            elif self._quantity(receipt['gasUsed']) == gas_limit:
+                logger.error("❌ Транзакция %s reverted: израсходован весь лимит газа %s", tx_hash_hex, gas_limit)
+                return False, WalletStatus.OUT_OF_GAS, f"Транзакция reverted: не хватило газа ({gas_limit}). TX: {tx_hash_hex}"
             else:
-                logger.error(f"❌ Транзакция не выполнена (reverted)")
+                logger.error("❌ Транзакция не выполнена (reverted): %s", tx_hash_hex)
                 return False, WalletStatus.FAILED, f"Транзакция reverted. TX: {tx_hash_hex}"
+        
+        except asyncio.TimeoutError:
+            self._pending_receipts.pop(tx_hash_hex, None)
+            logger.error("❌ Транзакция %s не подтверждена за %s секунд", tx_hash_hex, RECEIPT_TIMEOUT)
+            return False, WalletStatus.TIMEOUT, f"Нет подтверждения за {RECEIPT_TIMEOUT} секунд. TX: {tx_hash_hex}"
                 
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"❌ Ошибка при отправке GM: {error_msg}")
-            
-            # Более детальная обработка ошибок
-            if "insufficient funds" in error_msg.lower():
-                return False, WalletStatus.INSUFFICIENT_BALANCE, error_msg
-            elif "already" in error_msg.lower() or "wait" in error_msg.lower():
-                return False, WalletStatus.ALREADY_GMED, error_msg
-            elif "timeout" in error_msg.lower():
-                return False, WalletStatus.TIMEOUT, error_msg
-            else:
-                return False, WalletStatus.FAILED, error_msg
+            logger.error("❌ Ошибка ожидания подтверждения %s: %s", tx_hash_hex, error_msg)
+            return False, self._error_status(error_msg), error_msg
+    
+    def _log_wallet_header(self, address, attempt):
+        """Заголовок попытки обработки кошелька в логе"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info("\n%s", '=' * 60)
+        logger.info("Обработка кошелька: %s...%s", address[:10], address[-8:])
+        logger.info("Попытка: %s/%s", attempt, self.config['max_retries'])
+        logger.info('=' * 60)
     
-    def process_wallet(self, wallet_data, attempt=1):
-        """Обработка одного кошелька"""
+    async def process_wallet(self, wallet_data, attempt=1):
+        """
+        Отправка транзакции кошелька (без ожидания подтверждения)
+        
+        Returns:
+            tuple: (tx_hash, status, message) как у submit_gm_transaction
+        """
+        self._log_wallet_header(wallet_data['address'], attempt)
+        
+        # Предзагруженное состояние актуально только для первой попытки -
+        # после неудачной отправки nonce мог измениться
+        state = None
+        raw_transaction = None
+        if attempt == 1:
+            state = self._wallet_state.get(wallet_data['_addr_lc'])
+            raw_transaction = self._presigned.get(wallet_data['_addr_lc'])
+        
+        # Семафор ограничивает число одновременных отправок; ожидание
+        # подтверждения идет вне семафора и не задерживает другие кошельки
+        async with self._semaphore:
+            return await self.submit_gm_transaction(wallet_data, state, raw_transaction, replace=attempt > 1)
+    
+    def _record_result(self, result):
+        """Запись результата попытки в JSON Lines файл и обновление счетчиков"""
+        result['timestamp'] = _format_timestamp(int(result['ts']))
+        self._result_fp.write(orjson.dumps(result) + b'\n')
+        self._status_counts[result['status']] += 1
+    
+    async def _run_wallet(self, wallet_data):
+        """Полная обработка кошелька: отправка, подтверждение и повторы"""
         address = wallet_data['address']
         
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Обработка кошелька: {address[:10]}...{address[-8:]}")
-        logger.info(f"Попытка: {attempt}/{self.config['max_retries']}")
-        logger.info(f"{'='*60}")
+        # Кошелек не прошел проверку при загрузке - сразу в failed, без RPC
+        if '_error' in wallet_data:
+            self._record_result({
+                'address': address,
+                'attempt': 1,
+                'status': WalletStatus.FAILED,
+                'message': wallet_data['_error'],
+                'ts': time.time()
+            })
+            self.failed_wallets.append({
+                'address': address,
+                'last_status': WalletStatus.FAILED,
+                'last_error': wallet_data['_error']
+            })
+            return
         
-        return self.send_gm_transaction(wallet_data)
+        # Случайное смещение старта вместо последовательной задержки между кошельками
+        if self._max_delay:
+            delay = random.uniform(self._min_delay, self._max_delay)
+            logger.info("⏳ Задержка перед кошельком %s...: %.0f секунд...", address[:10], delay)
+            await asyncio.sleep(delay)
+        
+        attempt = 1
+        tx_hash, status, message = await self.process_wallet(wallet_data, attempt)
+        while True:
+            success = False
+            if tx_hash is not None:
+                success, status, message = await self.wait_for_confirmation(
+                    tx_hash, wallet_data.get('_gas_limit', self._gm_gas_limit)
+                )
+            
+            # Сохранение результата
+            self._record_result({
+                'address': address,
+                'attempt': attempt,
+                'status': status,
+                'message': message,
+                'ts': time.time()
+            })
+            
+            if success or status == WalletStatus.ALREADY_GMED:
+                # Успех или уже отправлен - не повторяем
+                break
+            
+            if attempt >= self.config['max_retries']:
+                break
+            
+            if status == WalletStatus.OUT_OF_GAS:
+                await self.reestimate_gas_limit(wallet_data)
+            
+            retry_delay = self.config['retry_delay']
+            logger.info("⏳ Повтор через %s секунд...", retry_delay)
+            await asyncio.sleep(retry_delay)
+            
+            attempt += 1
+            tx_hash, status, message = await self.process_wallet(wallet_data, attempt)
+        
+        if not success and status != WalletStatus.ALREADY_GMED:
+            self.failed_wallets.append({
+                'address': address,
+                'last_status': status,
+                'last_error': message
+            })
     
     def run(self):
         """Запуск обработки всех кошельков"""
+        asyncio.run(self._run())
+    
+    async def _run(self):
+        """Асинхронная обработка всех кошельков в одном event loop"""
         logger.info("🚀 Запуск GM бота для Ink Chain")
         logger.info(f"Количество кошельков: {len(self.config['wallets'])}")
         logger.info(f"Максимум попыток: {self.config['max_retries']}")
         
         delay_config = self.config.get('delay_between_wallets', {})
-        delay_enabled = delay_config.get('enabled', False)
+        self._min_delay = 0
+        self._max_delay = 0
         
-        if delay_enabled:
-            min_delay = delay_config.get('min_seconds', 30)
-            max_delay = delay_config.get('max_seconds', 80)
-            logger.info(f"⏱️ Задержка между кошельками: {min_delay}-{max_delay} секунд")
+        if delay_config.get('enabled', False):
+            self._min_delay = delay_config.get('min_seconds', 30)
+            self._max_delay = delay_config.get('max_seconds', 80)
+            logger.info(f"⏱️ Случайная задержка старта кошельков: {self._min_delay}-{self._max_delay} секунд")
         
-        for index, wallet_data in enumerate(self.config['wallets']):
-            address = wallet_data['address']
-            success = False
+        max_workers = self.config.get('max_workers', 8)
+        logger.info(f"🧵 Одновременных отправок: {max_workers}")
+        self._semaphore = asyncio.Semaphore(max_workers)
+        
+        try:
+            await self.connect()
+            try:
+                self._wallet_state = await self.prefetch_wallet_state([
+                    wallet_data['address'] for wallet_data in self.config['wallets']
+                    if '_error' not in wallet_data
+                ])
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось предзагрузить состояние кошельков: {e}")
+                self._wallet_state = {}
             
-            # Добавляем задержку перед обработкой кошелька (кроме первого)
-            if delay_enabled and index > 0:
-                delay = random.randint(min_delay, max_delay)
-                logger.info(f"\n⏳ Задержка перед следующим кошельком: {delay} секунд...")
-                time.sleep(delay)
+            try:
+                self._fee_params = await self.get_fee_params()
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось получить цену газа: {e}")
+                self._fee_params = None
             
-            for attempt in range(1, self.config['max_retries'] + 1):
-                success, status, error_message = self.process_wallet(wallet_data, attempt)
-                
-                # Сохранение результата
-                result = {
-                    'address': address,
-                    'attempt': attempt,
-                    'status': status,
-                    'message': error_message,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                self.results.append(result)
-                
-                if success or status == WalletStatus.ALREADY_GMED:
-                    # Успех или уже отправлен - не повторяем
-                    break
-                
-                if attempt < self.config['max_retries']:
-                    retry_delay = self.config['retry_delay']
-                    logger.info(f"⏳ Повтор через {retry_delay} секунд...")
-                    time.sleep(retry_delay)
+            try:
+                await self.init_gas_limit()
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось оценить газ: {e}. Используем {self._gm_gas_limit}")
             
-            if not success and status != WalletStatus.ALREADY_GMED:
-                self.failed_wallets.append({
-                    'address': address,
-                    'last_status': status,
-                    'last_error': error_message
-                })
+            try:
+                self._presigned = await self.presign_transactions()
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось подписать транзакции заранее: {e}")
+                self._presigned = {}
+            
+            # Результаты попыток пишутся построчно по мере поступления
+            self._run_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self._results_stream = f"results_{self._run_timestamp}.jsonl"
+            # Без буфера: каждая строка уходит на диск одним write и переживает падение
+            self._result_fp = open(self._results_stream, 'ab', buffering=0)
+            receipt_poller = asyncio.create_task(self._poll_receipts())
+            try:
+                await self._process_all()
+            finally:
+                receipt_poller.cancel()
+                self._result_fp.close()
+        finally:
+            # connect() мог упасть уже после открытия сессии
+            if self._session:
+                await self._session.close()
         
+        # Итоги считаются один раз и используются и для вывода, и для сохранения
+        self._summary = {
+            'total': len(self.config['wallets']),
+            'successful': self._status_counts[WalletStatus.SUCCESS],
+            'already_gmed': self._status_counts[WalletStatus.ALREADY_GMED],
+            'failed': len(self.failed_wallets)
+        }
         self.print_summary()
         self.save_results()
     
+    async def _process_all(self):
+        """Параллельная обработка всех кошельков"""
+        wallets = self.config['wallets']
+        outcomes = await asyncio.gather(
+            *(self._run_wallet(wallet_data) for wallet_data in wallets),
+            return_exceptions=True
+        )
+        for wallet_data, outcome in zip(wallets, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("❌ Ошибка обработки кошелька %s...: %s", wallet_data['address'][:10], outcome)
+                self.failed_wallets.append({
+                    'address': wallet_data['address'],
+                    'last_status': WalletStatus.FAILED,
+                    'last_error': str(outcome)
+                })
+    
     def print_summary(self):
         """Вывод итоговой статистики"""
         logger.info("\n" + "="*60)
         logger.info("📊 ИТОГОВАЯ СТАТИСТИКА")
         logger.info("="*60)
         
-        total = len(self.config['wallets'])
-        successful = sum(1 for r in self.results if r['status'] == WalletStatus.SUCCESS)
-        already_gmed = sum(1 for r in self.results if r['status'] == WalletStatus.ALREADY_GMED)
-        failed = len(self.failed_wallets)
-        
-        logger.info(f"Всего кошельков: {total}")
-        logger.info(f"✅ Успешно: {successful}")
-        logger.info(f"⏰ Уже отправлен GM: {already_gmed}")
-        logger.info(f"❌ Неудачно: {failed}")
+        summary = self._summary
+        logger.info(f"Всего кошельков: {summary['total']}")
+        logger.info(f"✅ Успешно: {summary['successful']}")
+        logger.info(f"⏰ Уже отправлен GM: {summary['already_gmed']}")
+        logger.info(f"❌ Неудачно: {summary['failed']}")
         
         if self.failed_wallets:
             logger.info("\n🔴 Проблемные кошельки:")
@@ -395,24 +1122,27 @@ class GMBot:
                 logger.info(f"    Статус: {wallet['last_status']}")
                 logger.info(f"    Ошибка: {wallet['last_error']}")
     
+    @staticmethod
+    def _failed_addresses(failed_file):
+        """Отсортированные адреса (lowercase) из failed файла или None при ошибке чтения"""
+        try:
+            data = orjson.loads(Path(failed_file).read_bytes())
+            return sorted(wallet['address'].lower() for wallet in data['wallets'])
+        except Exception:
+            return None
+    
     def save_results(self):
-        """Сохранение результатов в JSON"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        """Сохранение итогов и failed кошельков в JSON (попытки уже записаны в .jsonl)"""
+        timestamp = self._run_timestamp
         results_file = f"results_{timestamp}.json"
         
-        # Сохраняем полные результаты
-        with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'results': self.results,
-                'failed_wallets': self.failed_wallets,
-                'summary': {
-                    'total': len(self.config['wallets']),
-                    'successful': sum(1 for r in self.results if r['status'] == WalletStatus.SUCCESS),
-                    'already_gmed': sum(1 for r in self.results if r['status'] == WalletStatus.ALREADY_GMED),
-                    'failed': len(self.failed_wallets)
-                }
-            }, f, indent=4, ensure_ascii=False)
-        logger.info(f"💾 Результаты сохранены в {results_file}")
+        # Сохраняем итоги - подробные результаты попыток в results_*.jsonl
+        Path(results_file).write_bytes(orjson.dumps({
+            'results_file': self._results_stream,
+            'failed_wallets': self.failed_wallets,
+            'summary': self._summary
+        }, option=orjson.OPT_INDENT_2))
+        logger.info(f"💾 Результаты сохранены в {results_file} (попытки: {self._results_stream})")
         
         # Сохраняем failed кошельки в отдельный файл для retry
         if self.failed_wallets:
@@ -424,23 +1154,36 @@ class GMBot:
             }
             
             # Находим полные данные кошельков (с private_key и proxy)
+            # Кошельки без адреса в failed файл не попадают - их нужно исправить в конфиге
+            wallet_by_addr = {
+                wallet['_addr_lc']: wallet for wallet in self.config['wallets'] if wallet['_addr_lc']
+            }
             for failed in self.failed_wallets:
                 # Ищем оригинальный кошелек в конфиге
-                for wallet in self.config['wallets']:
-                    if wallet['address'].lower() == failed['address'].lower():
-                        failed_data['wallets'].append({
-                            'address': wallet['address'],
-                            'private_key': wallet['private_key'],
-                            'proxy': wallet.get('proxy'),
-                            'last_error': failed['last_error'],
-                            'last_status': failed['last_status']
-                        })
-                        break
-            
-            with open(failed_file, 'w', encoding='utf-8') as f:
-                json.dump(failed_data, f, indent=4, ensure_ascii=False)
-            
-            logger.info(f"🔴 Failed кошельки сохранены в {failed_file}")
+                wallet = wallet_by_addr.get(failed['address'].lower())
+                if wallet is not None:
+                    failed_data['wallets'].append({
+                        'address': wallet['address'],
+                        'private_key': wallet['private_key'],
+                        'proxy': wallet.get('proxy'),
+                        'last_error': failed['last_error'],
+                        'last_status': failed['last_status']
+                    })
+            failed_data['count'] = len(failed_data['wallets'])
+            if not failed_data['wallets']:
+                return
+            
+            # Если набор failed кошельков не изменился с прошлого запуска - файл не переписываем
+            previous_file = Config.find_latest_failed_file()
+            if previous_file is not None and self._failed_addresses(previous_file) == sorted(
+                wallet['address'].lower() for wallet in failed_data['wallets']
+            ):
+                failed_file = previous_file
+                logger.info(f"🔴 Failed кошельки не изменились, актуальный файл: {failed_file}")
+            else:
+                Path(failed_file).write_bytes(orjson.dumps(failed_data, option=orjson.OPT_INDENT_2))
+                logger.info(f"🔴 Failed кошельки сохранены в {failed_file}")
+            
             logger.info(f"📋 Для retry запустите: python main.py --retry {failed_file}")
             logger.info(f"   или просто: python main.py --retry-last")
 
@@ -448,6 +1191,8 @@ def main():
     """Главная функция"""
     import sys
     
+    setup_logging()
+    
     print("""
     ╔══════════════════════════════════════════════════════════╗
     ║          GM Bot для Ink Chain v2.0 (Web3)              ║
@@ -460,6 +1205,7 @@ def main():
     
     # Парсим аргументы командной строки
     wallet_range = None
+    wallet_arg = None
     retry_mode = False
     retry_file = None
     
@@ -478,11 +1224,12 @@ def main():
             retry_file = None  # Будем искать последний файл
             i += 1
         else:
-            # Это диапазон кошельков
+            # Это диапазон кошельков - в командной строке номера с 1 во всех формах
+            wallet_arg = arg
             if '-' in arg:
                 wallet_range = arg
             elif ',' in arg:
-                wallet_range = [int(x.strip()) for x in arg.split(',')]
+                wallet_range = [int(x.strip()) - 1 for x in arg.split(',')]
             else:
                 wallet_range = arg
             i += 1
@@ -498,8 +1245,9 @@ def main():
             if failed_wallets is None:
                 return
             
-            # Создаем временный конфиг только с failed кошельками
-            config = Config.load_config()
+            # Создаем временный конфиг только с failed кошельками -
+            # кошельки из основного конфига не нужны, пропускаем их при разборе
+            config = Config.load_config(wallet_range=[])
             if config is None:
                 return
             
@@ -508,14 +1256,16 @@ def main():
             logger.info(f"🎯 Будет обработано {len(failed_wallets)} failed кошельков")
             
         else:
-            config = Config.load_config()
+            # Диапазон применяется при разборе файла - невыбранные кошельки не загружаются
+            config = Config.load_config(wallet_range=wallet_range)
             if config is None:
                 logger.error("❌ Конфигурация не загружена!")
                 logger.error("Отредактируйте config.json и запустите скрипт снова")
                 return
             
             if wallet_range:
-                logger.info(f"🎯 Режим выбора кошельков: {wallet_range}")
+                logger.info(f"🎯 Режим выбора кошельков: {wallet_arg}")
+                logger.info(f"🎯 Выбрано кошельков для обработки: {len(config['wallets'])}")
         
         logger.info(f"✅ Конфигурация загружена")
         logger.info(f"📊 Всего кошельков: {len(config.get('wallets', []))}")
@@ -530,8 +1280,13 @@ def main():
             logger.error("❌ Кошельки не настроены!")
             return
         
+        # Checksum адресов и проверка ключей - один раз до любых RPC вызовов
+        invalid = Config.normalize_wallets(config['wallets'])
+        if invalid:
+            logger.warning(f"⚠️ Невалидных кошельков: {invalid} - они будут пропущены")
+        
         logger.info("🚀 Инициализация бота...")
-        bot = GMBot(config, wallet_range=wallet_range if not retry_mode else None)
+        bot = GMBot(config)
         
         logger.info("▶️  Начинаем обработку кошельков...")
         bot.run()